@@ -0,0 +1,549 @@
+"""
+Conciliação entre dois razões (XLSX da planilha e/ou CSV exportado do dashboard/banco).
+
+Etapas:
+- Lê cada lado em streaming (CSV linha a linha; XLSX com iterparse, <row> a <row>)
+- Aplica aos dois formatos a mesma limpeza do dashboard (metadados, Tipo inválido), que
+  mantém todos os Status e valores zerados; --so-conciliado reproduz analyze_dre
+  (Status = Conciliado e valor != 0)
+- --mes / --prefixo restringem os dois lados ao mesmo escopo (ex.: export de julho, 1.x)
+- Normaliza cada linha em uma chave (data, categoria, valor em centavos, descrição)
+- Hash-join em O(n): indexa apenas o lado ESQUERDO (chave completa -> contagem)
+  e percorre o lado DIREITO consumindo o índice, sem montar listas de dicts
+- Linhas que batem em (data, categoria, descrição) mas não no valor => divergência de valor
+- Demais sobras => faltando à direita / faltando à esquerda
+- Totais por (mês, categoria) dos dois lados e o delta entre eles
+
+Uso (os dois lados precisam cobrir o mesmo escopo, senão tudo vira "faltando"):
+    python reconcile_ledgers.py ../dashboard-financeiro/Teste.xlsx out_jul_receitas.csv \
+        --so-conciliado --mes 2025-07 --prefixo 1.
+    python reconcile_ledgers.py esquerda.csv direita.csv --abs --saida diferencas.csv
+"""
+
+from __future__ import annotations
+import argparse
+import csv
+import math
+import re
+import sys
+import unicodedata
+import xml.etree.ElementTree as ET
+import zipfile
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import ROUND_HALF_UP, Decimal
+from itertools import islice
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from analyze_dre import brl, col_to_index, read_shared_strings, validate_tipo
+from check_sheets import list_sheets_with_paths
+
+# (data ISO yyyy-mm-dd, categoria, descrição) — chave sem o valor
+LooseKey = Tuple[str, str, str]
+# (data, categoria, descrição, valor em centavos) — chave do join
+FullKey = Tuple[str, str, str, int]
+
+_SPACES = re.compile(r"\s+")
+_DMY = re.compile(r"(\d{1,2})/(\d{1,2})/(\d{4})")
+_YMD = re.compile(r"(\d{4})-(\d{1,2})-(\d{1,2})")
+# formatos de valor aceitos (sem sinal, sem 'R$'); qualquer outro é linha inválida
+_BRL_THOUSANDS = re.compile(r"\d{1,3}(?:\.\d{3})+(?:,\d+)?")   # 1.234 | 1.234,56
+_US_THOUSANDS = re.compile(r"\d{1,3}(?:,\d{3})+(?:\.\d+)?")    # 1,234 | 1,234.56
+_COMMA_DECIMAL = re.compile(r"\d+,\d+")                         # 10,5
+_DOT_DECIMAL = re.compile(r"\d+(?:\.\d+)?")                    # 701.4 | 100
+_INTEGER = re.compile(r"\d+")
+# um único separador seguido de 1, 2 ou 4+ dígitos só pode ser o decimal
+_UNAMBIGUOUS_DECIMAL = re.compile(r"\d*([.,])(?:\d{1,2}|\d{4,})")
+# serial do Excel: dia 0 = 1899-12-30 (já compensa o bug do ano bissexto de 1900);
+# 61 = 1900-03-01 (antes disso o bug desloca um dia), 2958465 = 9999-12-31
+_EXCEL_EPOCH = date(1899, 12, 30)
+_EXCEL_SERIAL_RANGE = (61, 2958465)
+
+
+def normalize_text(v: Any) -> str:
+    # Remove acentos, espaços repetidos/nas pontas e diferença de caixa
+    s = str(v or '')
+    if not s.isascii():
+        s = unicodedata.normalize('NFKD', s)
+        s = ''.join(c for c in s if not unicodedata.combining(c))
+    return _SPACES.sub(' ', s).strip().casefold()
+
+
+def normalize_date(v: Any) -> Optional[str]:
+    """Converte data para 'yyyy-mm-dd'; None se inválida.
+
+    Texto precisa ser dd/mm/yyyy ou ISO. O serial do Excel só é aceito vindo de célula
+    numérica (int/float) dentro de _EXCEL_SERIAL_RANGE; '2025' em texto não é data.
+    """
+    try:
+        if isinstance(v, bool):
+            return None
+        if isinstance(v, (int, float)):
+            lo, hi = _EXCEL_SERIAL_RANGE
+            if not (math.isfinite(v) and lo <= v <= hi):
+                return None
+            d = _EXCEL_EPOCH + timedelta(days=int(v))
+        else:
+            s = str(v or '').strip()
+            m = _YMD.search(s)
+            m2 = None if m else _DMY.search(s)
+            if m:
+                y, M, dd = map(int, m.groups())
+                d = date(y, M, dd)
+            elif m2:
+                dd, M, y = map(int, m2.groups())
+                d = date(y, M, dd)
+            else:
+                return None
+    except (ValueError, OverflowError):
+        return None
+    return d.isoformat()
+
+
+def to_cents(v: Any, decimal: Optional[str] = None) -> Optional[int]:
+    """Valor em centavos inteiros (evita comparar floats); None se não for um valor reconhecido.
+
+    `decimal` é o separador decimal do arquivo (',' ou '.', ver detect_decimal). Sem ele,
+    o '.' é separador de milhar quando agrupa blocos de 3 dígitos ('1.234' = 1.234,00),
+    o que é ambíguo num arquivo com ponto decimal ('0.125'); por isso main detecta a
+    convenção por arquivo. Aceita um único sinal '-' no início ou fim, ou parênteses.
+    """
+    if isinstance(v, bool):
+        return None
+    if isinstance(v, (int, float)):
+        if not math.isfinite(v):
+            return None
+        s = repr(float(v))
+        neg = s.startswith('-')
+        s = s.lstrip('-')
+        if 'e' in s:
+            s = format(Decimal(s), 'f')
+    else:
+        s = str(v or '').replace('R$', '').replace(' ', '').replace('\xa0', '').strip()
+        neg = False
+        # no máximo um sinal: '(10)', '-10', '+10' ou '10-'; '(-10)' e '--5' são inválidos
+        if s.startswith('(') and s.endswith(')'):
+            neg, s = True, s[1:-1]
+        elif s[:1] in ('-', '+'):
+            neg, s = s[0] == '-', s[1:]
+        elif s.endswith('-'):
+            neg, s = True, s[:-1]
+        comma_ok = decimal in (None, ',')
+        dot_ok = decimal in (None, '.')
+        if comma_ok and _BRL_THOUSANDS.fullmatch(s):
+            s = s.replace('.', '').replace(',', '.')
+        elif dot_ok and _US_THOUSANDS.fullmatch(s):
+            s = s.replace(',', '')
+        elif comma_ok and _COMMA_DECIMAL.fullmatch(s):
+            s = s.replace(',', '.')
+        elif not (_DOT_DECIMAL if dot_ok else _INTEGER).fullmatch(s):
+            return None
+    cents = int((Decimal(s) * 100).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+    return -cents if neg else cents
+
+
+def detect_decimal(values: Iterable[Any]) -> Optional[str]:
+    """Separador decimal (',' ou '.') mais votado numa amostra de valores em texto.
+
+    Só votam valores inequívocos: '1.234,56' / '1,234.56' (o último separador é o decimal)
+    e um único separador sem exatamente 3 dígitos depois ('10,5', '701.4'). None se não
+    houver votos ou houver empate; células numéricas do XLSX não votam.
+    """
+    votes = {',': 0, '.': 0}
+    for v in values:
+        if not isinstance(v, str):
+            continue
+        s = v.replace('R$', '').replace(' ', '').replace('\xa0', '').strip('()+-')
+        comma, dot = s.rfind(','), s.rfind('.')
+        if comma >= 0 and dot >= 0:
+            votes[',' if comma > dot else '.'] += 1
+        else:
+            m = _UNAMBIGUOUS_DECIMAL.fullmatch(s)
+            if m:
+                votes[m.group(1)] += 1
+    if votes[','] == votes['.']:
+        return None
+    return ',' if votes[','] > votes['.'] else '.'
+
+
+def _find_column(headers: List[str], *parts: str, fallback: str = '') -> Optional[int]:
+    lowered = [normalize_text(h).replace(' ', '') for h in headers]
+    for i, h in enumerate(lowered):
+        if all(p in h for p in parts):
+            return i
+    if fallback:
+        for i, h in enumerate(lowered):
+            if fallback in h:
+                return i
+    return None
+
+
+# cabeçalhos de tabela dinâmica/metadados descartados pelo app (dataService / analyze_dre)
+_METADATA_HEADERS = ('locagora', 'rótulos', 'labels', 'total', 'soma', 'subtotal')
+
+
+def _csv_rows(path: Path, encoding: str = 'utf-8-sig') -> Iterator[List[Any]]:
+    """Cabeçalho e linhas de um CSV (',' ou ';'), lidos um a um."""
+    with path.open('r', newline='', encoding=encoding) as f:
+        first = f.readline()
+        delimiter = ';' if first.count(';') > first.count(',') else ','
+        yield next(csv.reader([first], delimiter=delimiter), [])
+        yield from csv.reader(f, delimiter=delimiter)
+
+
+def _xlsx_rows(path: Path) -> Iterator[List[Any]]:
+    """Cabeçalho e linhas da primeira aba via iterparse; cada <row> é descartado após lido.
+
+    Só a tabela de sharedStrings fica inteira em memória.
+    """
+    with zipfile.ZipFile(path, 'r') as z:
+        shared = read_shared_strings(z)
+        _, sheet_path = list_sheets_with_paths(z)[0]
+        with z.open(sheet_path) as f:
+            sheet_data = None
+            for event, elem in ET.iterparse(f, events=('start', 'end')):
+                if event == 'start':
+                    if elem.tag.endswith('}sheetData'):
+                        sheet_data = elem
+                    continue
+                if not elem.tag.endswith('}row'):
+                    continue
+                ns = elem.tag[:-len('row')]
+                cells: List[Any] = []
+                for c in elem.findall(ns + 'c'):
+                    idx = col_to_index(c.attrib.get('r', 'A1'))
+                    while len(cells) <= idx:
+                        cells.append('')
+                    v = c.find(ns + 'v')
+                    val: Any = ''
+                    if v is not None and v.text is not None:
+                        if c.attrib.get('t') == 's':
+                            try:
+                                val = shared[int(v.text)]
+                            except (ValueError, IndexError):
+                                val = ''
+                        else:
+                            try:
+                                val = float(v.text)
+                            except ValueError:
+                                val = v.text
+                    cells[idx] = val
+                yield cells
+                if sheet_data is not None:
+                    sheet_data.clear()
+
+
+def _open_rows(path: Path, encoding: str = 'utf-8-sig') -> Iterator[List[Any]]:
+    if path.suffix.lower() in ('.xlsx', '.xlsm'):
+        return _xlsx_rows(path)
+    return _csv_rows(path, encoding)
+
+
+def ledger_decimal(path: Path, encoding: str = 'utf-8-sig', sample: int = 1000) -> Optional[str]:
+    """detect_decimal sobre as primeiras `sample` linhas da coluna de valor do arquivo."""
+    rows = _open_rows(path, encoding)
+    try:
+        headers = [str(h or '').strip() for h in next(rows, [])]
+        value_col = _find_column(headers, 'valor', 'efet', fallback='valor')
+        if value_col is None:
+            return None
+        return detect_decimal(_cell(r, value_col) for r in islice(rows, sample))
+    finally:
+        rows.close()
+
+
+def _cell(row: List[Any], c: Optional[int]) -> Any:
+    return row[c] if c is not None and c < len(row) else ''
+
+
+def iter_ledger(
+    path: Path,
+    only_reconciled: bool = False,
+    months: Optional[List[str]] = None,
+    prefixes: Optional[List[str]] = None,
+    skipped: Optional[Dict[str, int]] = None,
+    encoding: str = 'utf-8-sig',
+    decimal: Optional[str] = None,
+) -> Iterator[Tuple[Any, Any, Any, Any]]:
+    """Gera (data, categoria, valor, descrição) de um XLSX ou CSV, linha a linha.
+
+    Como o dashboard (dataService.ts), mantém todos os Status e valores zerados e só
+    descarta cabeçalhos de tabela dinâmica/metadados e Tipo inválido (se houver coluna
+    Tipo). `only_reconciled` aplica os critérios de analyze_dre.map_to_financial_records:
+    Status = 'Conciliado' (se houver coluna Status) e valor != 0. `months` ('yyyy-mm') e
+    `prefixes` (início da categoria) limitam o escopo; `decimal` vai para to_cents. Valores/datas ilegíveis seguem
+    adiante para serem reportados como inválidos. `skipped` conta os descartes por motivo.
+
+    O cabeçalho é lido e validado já na chamada (ValueError se faltar data/valor), antes
+    de qualquer linha ser consumida; só as linhas são geradas sob demanda.
+    """
+    rows = _open_rows(path, encoding)
+    headers = [str(h or '').strip() for h in next(rows, [])]
+    date_col = _find_column(headers, 'data', 'efet', fallback='data')
+    cat_col = _find_column(headers, 'categoria')
+    value_col = _find_column(headers, 'valor', 'efet', fallback='valor')
+    desc_col = _find_column(headers, 'descri')
+    status_col = _find_column(headers, 'status') if only_reconciled else None
+    prefixes_n = tuple(normalize_text(p) for p in prefixes or ())
+    tipo_col = _find_column(headers, 'tipo')
+    if date_col is None or value_col is None:
+        raise ValueError(f"{path}: colunas de data/valor não encontradas em {headers}")
+    metadata = any(t in h.lower() for h in headers for t in _METADATA_HEADERS)
+
+    def skip(reason: str) -> None:
+        if skipped is not None:
+            skipped[reason] = skipped.get(reason, 0) + 1
+
+    def generate() -> Iterator[Tuple[Any, Any, Any, Any]]:
+        for row in rows:
+            if not any(x not in (None, '', 0) for x in row):
+                continue
+
+            if metadata:
+                skip('cabeçalho de metadados')
+                continue
+            if status_col is not None and str(_cell(row, status_col)).strip() != 'Conciliado':
+                skip('status diferente de Conciliado')
+                continue
+            if tipo_col is not None:
+                try:
+                    validate_tipo(_cell(row, tipo_col))
+                except ValueError:
+                    skip('tipo inválido')
+                    continue
+            value = _cell(row, value_col)
+            if only_reconciled and to_cents(value, decimal) == 0:
+                skip('valor zero')
+                continue
+            data = _cell(row, date_col)
+            if months:
+                iso = normalize_date(data)
+                if iso is not None and iso[:7] not in months:
+                    skip('fora do período')
+                    continue
+            cat = _cell(row, cat_col)
+            if prefixes_n and not normalize_text(cat).startswith(prefixes_n):
+                skip('fora das categorias')
+                continue
+            yield (data, cat, value, _cell(row, desc_col))
+
+    return generate()
+
+
+class Reconciliation:
+    """Resultado do hash-join; valores sempre em centavos."""
+
+    def __init__(self) -> None:
+        self.left_rows = 0
+        self.right_rows = 0
+        self.matched = 0
+        self.only_left: List[Tuple[LooseKey, int]] = []
+        self.only_right: List[Tuple[LooseKey, int]] = []
+        self.value_mismatches: List[Tuple[LooseKey, int, int]] = []
+        # (lado, motivo, linha original) — fora do join e dos totais
+        self.invalid: List[Tuple[str, str, Tuple[Any, Any, Any, Any]]] = []
+        # (mês yyyy-mm, categoria) -> [total esquerda, total direita]
+        self.totals: Dict[Tuple[str, str], List[int]] = defaultdict(lambda: [0, 0])
+
+    def deltas(self) -> List[Tuple[str, str, int, int, int]]:
+        """(mês, categoria, esquerda, direita, direita - esquerda) apenas onde há diferença."""
+        out = []
+        for (month, cat), (left, right) in sorted(self.totals.items()):
+            if left != right:
+                out.append((month, cat, left, right, right - left))
+        return out
+
+
+def _group_leftovers(counts: Dict[FullKey, int]) -> Dict[LooseKey, List[int]]:
+    grouped: Dict[LooseKey, List[int]] = defaultdict(list)
+    for (data, cat, desc, cents), n in counts.items():
+        grouped[(data, cat, desc)].extend([cents] * n)
+    return grouped
+
+
+def reconcile(
+    left: Iterator[Tuple[Any, Any, Any, Any]],
+    right: Iterator[Tuple[Any, Any, Any, Any]],
+    use_abs: bool = False,
+    decimals: Tuple[Optional[str], Optional[str]] = (None, None),
+) -> Reconciliation:
+    """Concilia dois razões em O(n + m).
+
+    Só o lado esquerdo é indexado: chave completa (data, categoria, descrição, centavos)
+    -> contagem, então cada linha do lado direito custa O(1) mesmo quando milhares de
+    linhas repetem a mesma data/categoria/descrição. No fim, as sobras dos dois lados são
+    reagrupadas pela chave solta: pares viram divergência de valor, o resto é linha faltante.
+    """
+    result = Reconciliation()
+    index: Dict[FullKey, int] = {}
+    categories: Dict[Any, str] = {}
+
+    def key_of(rec: Tuple[Any, Any, Any, Any], side: str) -> Optional[FullKey]:
+        data, cat, valor, desc = rec
+        data_n = normalize_date(data)
+        cents = to_cents(valor, decimals[0] if side == 'esquerda' else decimals[1])
+        if data_n is None or cents is None:
+            reason = 'data inválida' if data_n is None else 'valor inválido'
+            result.invalid.append((side, reason, rec))
+            return None
+        if use_abs:
+            cents = abs(cents)
+        # categorias se repetem muito: normaliza uma vez e guarda uma única instância
+        cat_n = categories.get(cat)
+        if cat_n is None:
+            cat_n = categories[cat] = normalize_text(cat)
+        return (data_n, cat_n, normalize_text(desc), cents)
+
+    for rec in left:
+        result.left_rows += 1
+        key = key_of(rec, 'esquerda')
+        if key is None:
+            continue
+        index[key] = index.get(key, 0) + 1
+        result.totals[(key[0][:7], key[1])][0] += key[3]
+
+    # sobras do lado direito, também como chave completa -> contagem
+    pending: Dict[FullKey, int] = {}
+    for rec in right:
+        result.right_rows += 1
+        key = key_of(rec, 'direita')
+        if key is None:
+            continue
+        result.totals[(key[0][:7], key[1])][1] += key[3]
+        n = index.get(key)
+        if n:
+            if n == 1:
+                del index[key]
+            else:
+                index[key] = n - 1
+            result.matched += 1
+        else:
+            pending[key] = pending.get(key, 0) + 1
+
+    left_by = _group_leftovers(index)
+    right_by = _group_leftovers(pending)
+    for loose in left_by.keys() | right_by.keys():
+        left_vals = sorted(left_by.get(loose, ()))
+        right_vals = sorted(right_by.get(loose, ()))
+        # pareia na ordem dos valores: a menor sobra de um lado com a menor do outro
+        for lv, rv in zip(left_vals, right_vals):
+            result.value_mismatches.append((loose, lv, rv))
+        result.only_left.extend((loose, v) for v in left_vals[len(right_vals):])
+        result.only_right.extend((loose, v) for v in right_vals[len(left_vals):])
+
+    result.only_left.sort()
+    result.only_right.sort()
+    result.value_mismatches.sort()
+    return result
+
+
+def write_differences(res: Reconciliation, out: Path) -> None:
+    with out.open('w', newline='', encoding='utf-8') as f:
+        w = csv.writer(f)
+        w.writerow(['tipo', 'data', 'categoria', 'descricao', 'valorEsquerda', 'valorDireita', 'motivo'])
+        for (data, cat, desc), v in res.only_left:
+            w.writerow(['faltando_direita', data, cat, desc, v / 100, '', ''])
+        for (data, cat, desc), v in res.only_right:
+            w.writerow(['faltando_esquerda', data, cat, desc, '', v / 100, ''])
+        for (data, cat, desc), lv, rv in res.value_mismatches:
+            w.writerow(['valor_divergente', data, cat, desc, lv / 100, rv / 100, ''])
+        for side, reason, (data, cat, valor, desc) in res.invalid:
+            lv, rv = (valor, '') if side == 'esquerda' else ('', valor)
+            w.writerow([f'invalida_{side}', data, cat, desc, lv, rv, reason])
+
+
+def print_report(res: Reconciliation, limit: int) -> None:
+    print(f"Linhas esquerda: {res.left_rows} | direita: {res.right_rows} | conciliadas: {res.matched}")
+    print(f"Faltando à direita: {len(res.only_left)} | faltando à esquerda: {len(res.only_right)}"
+          f" | valores divergentes: {len(res.value_mismatches)} | inválidas: {len(res.invalid)}")
+
+    sections = [
+        ("Faltando à DIREITA (só na esquerda)", res.only_left),
+        ("Faltando à ESQUERDA (só na direita)", res.only_right),
+    ]
+    for title, rows in sections:
+        if rows:
+            print(f"\n{title}:")
+            for (data, cat, desc), v in rows[:limit]:
+                print(f"{data}; {cat}; {desc}; {brl(v / 100)}")
+            if len(rows) > limit:
+                print(f"... (+{len(rows) - limit})")
+
+    if res.value_mismatches:
+        print("\nValores divergentes (esquerda -> direita):")
+        for (data, cat, desc), lv, rv in res.value_mismatches[:limit]:
+            print(f"{data}; {cat}; {desc}; {brl(lv / 100)} -> {brl(rv / 100)}")
+        if len(res.value_mismatches) > limit:
+            print(f"... (+{len(res.value_mismatches) - limit})")
+
+    if res.invalid:
+        print("\nLinhas INVÁLIDAS (fora da conciliação e dos totais):")
+        for side, reason, (data, cat, valor, desc) in res.invalid[:limit]:
+            print(f"{side}; {reason}; {data}; {cat}; {desc}; {valor}")
+        if len(res.invalid) > limit:
+            print(f"... (+{len(res.invalid) - limit})")
+
+    deltas = res.deltas()
+    print("\nDelta por MÊS e CATEGORIA (direita - esquerda):")
+    if not deltas:
+        print('(sem diferenças)')
+    for month, cat, left, right, delta in deltas:
+        print(f"{month}; {cat}; {brl(left / 100)}; {brl(right / 100)}; {brl(delta / 100)}")
+
+
+def _month_arg(v: str) -> str:
+    if not re.fullmatch(r"\d{4}-(0[1-9]|1[0-2])", v):
+        raise argparse.ArgumentTypeError(f"mês inválido: {v!r} (use AAAA-MM)")
+    return v
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    p = argparse.ArgumentParser(description='Concilia dois razões (XLSX ou CSV).')
+    p.add_argument('esquerda', type=Path, help='ex.: ../dashboard-financeiro/Teste.xlsx')
+    p.add_argument('direita', type=Path, help='ex.: out_jul_receitas.csv')
+    p.add_argument('--abs', action='store_true', help='compara valores absolutos (ignora sinal)')
+    p.add_argument('--so-conciliado', action='store_true',
+                   help='como analyze_dre: só Status = Conciliado e valor != 0 (padrão: tudo, como o dashboard)')
+    p.add_argument('--mes', action='append', type=_month_arg, metavar='AAAA-MM',
+                   help='só linhas deste mês (pode repetir)')
+    p.add_argument('--prefixo', action='append', metavar='CATEGORIA',
+                   help='só categorias que começam com este prefixo, ex.: 1. (pode repetir)')
+    p.add_argument('--saida', type=Path, help='grava as diferenças linha a linha neste CSV')
+    p.add_argument('--encoding', default='utf-8-sig',
+                   help='codificação dos CSV (ex.: cp1252 para extratos de banco)')
+    p.add_argument('--decimal', choices=[',', '.'],
+                   help='separador decimal dos dois arquivos (padrão: detecta em cada um)')
+    p.add_argument('--limite', type=int, default=50, help='máximo de linhas por seção no relatório')
+    args = p.parse_args(argv)
+
+    skipped: Dict[str, Dict[str, int]] = {'esquerda': {}, 'direita': {}}
+    scope = dict(only_reconciled=args.so_conciliado, months=args.mes, prefixes=args.prefixo,
+                 encoding=args.encoding)
+    try:
+        # os dois cabeçalhos são validados aqui, antes de indexar o lado esquerdo
+        decimals = tuple(args.decimal or ledger_decimal(path, args.encoding)
+                         for path in (args.esquerda, args.direita))
+        left = iter_ledger(args.esquerda, skipped=skipped['esquerda'], decimal=decimals[0], **scope)
+        right = iter_ledger(args.direita, skipped=skipped['direita'], decimal=decimals[1], **scope)
+        res = reconcile(left, right, use_abs=args.abs, decimals=decimals)
+    except UnicodeDecodeError as e:
+        print(f"Erro: arquivo não está em {args.encoding} ({e}); tente --encoding cp1252",
+              file=sys.stderr)
+        return 2
+    except (OSError, ValueError, zipfile.BadZipFile, ET.ParseError) as e:
+        print('Erro:', e, file=sys.stderr)
+        return 2
+    print_report(res, args.limite)
+    print(f"\nSeparador decimal: esquerda={decimals[0] or 'auto'} | direita={decimals[1] or 'auto'}")
+    for side, counts in skipped.items():
+        if counts:
+            print(f"\nDescartadas na {side} (filtros):", counts)
+    if args.saida:
+        write_differences(res, args.saida)
+        print('\nDiferenças exportadas:', args.saida)
+    return 0 if not (res.only_left or res.only_right or res.value_mismatches or res.invalid) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
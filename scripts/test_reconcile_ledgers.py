@@ -0,0 +1,273 @@
+"""Testes de reconcile_ledgers (rodar com `python -m pytest scripts`)."""
+
+from __future__ import annotations
+import csv
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from reconcile_ledgers import (
+    detect_decimal, iter_ledger, ledger_decimal, main, normalize_date, reconcile, to_cents,
+    write_differences,
+)
+
+DAY = '2025-07-01'
+CAT = '1.1.1 Locação de Veiculos'
+
+
+def rec(valor, desc='ALUGUEL SEMANAL', data=DAY, cat=CAT):
+    return (data, cat, valor, desc)
+
+
+@pytest.mark.parametrize('raw, cents', [
+    ('701.4', 70140),
+    ('100', 10000),
+    ('10,5', 1050),
+    ('1.234', 123400),
+    ('R$ 1.234', 123400),
+    ('1.234,56', 123456),
+    ('1.234.567,89', 123456789),
+    ('1,234.56', 123456),
+    ('-50,5', -5050),
+    ('50,5-', -5050),
+    ('(10,00)', -1000),
+    (276.84, 27684),
+    (0.1 + 0.2, 30),
+])
+def test_to_cents_formats(raw, cents):
+    assert to_cents(raw) == cents
+
+
+@pytest.mark.parametrize('raw', [
+    '', 'abc', '1,2.3', '12-3', float('nan'), None, '(-10)', '--5', '+-5', '-5-', '(10)-',
+])
+def test_to_cents_rejects_unknown(raw):
+    assert to_cents(raw) is None
+
+
+@pytest.mark.parametrize('raw, decimal, cents', [
+    # sem convenção, '0.125' é ambíguo e vira milhar BRL; com '.', é decimal
+    ('0.125', None, 12500),
+    ('0.125', '.', 13),
+    ('1.234', '.', 123),
+    ('1,234.56', '.', 123456),
+    ('1,5', '.', None),
+    ('1.234', ',', 123400),
+    ('10,5', ',', 1050),
+    ('100', ',', 10000),
+    ('701.4', ',', None),
+])
+def test_to_cents_with_file_decimal(raw, decimal, cents):
+    assert to_cents(raw, decimal) == cents
+
+
+@pytest.mark.parametrize('values, decimal', [
+    (['0.125', '701.4', '36.93'], '.'),
+    (['1.234', '10,5', '1.234,56'], ','),
+    (['1,234.56', '1.234'], '.'),
+    (['1.234', '100', 701.4], None),
+    (['10,5', '701.4'], None),
+])
+def test_detect_decimal(values, decimal):
+    assert detect_decimal(values) == decimal
+
+
+def test_ledger_decimal_from_export():
+    export = Path(__file__).resolve().parent / 'out_jul_receitas.csv'
+    assert ledger_decimal(export) == '.'
+
+
+@pytest.mark.parametrize('raw, iso', [
+    ('2025-07-04T00:00:00', '2025-07-04'),
+    ('01/07/2025', '2025-07-01'),
+    (45839.0, '2025-07-01'),
+    ('2025-13-45', None),
+    ('31/02/2025', None),
+    ('', None),
+    ('2025', None),
+    ('-1', None),
+    ('45839', None),
+    (45839, '2025-07-01'),
+    (0, None),
+    (-1, None),
+    (3_000_000, None),
+    (float('nan'), None),
+])
+def test_normalize_date(raw, iso):
+    assert normalize_date(raw) == iso
+
+
+def test_duplicate_keys_match_by_count():
+    res = reconcile(iter([rec('10,00')] * 3), iter([rec('10.00')] * 2))
+    assert res.matched == 2
+    assert res.only_left == [((DAY, '1.1.1 locacao de veiculos', 'aluguel semanal'), 1000)]
+    assert not res.only_right and not res.value_mismatches
+
+
+def test_value_mismatch_pairs_leftovers_by_loose_key():
+    left = [rec('100'), rec('200'), rec('300', desc='outra')]
+    right = [rec('100'), rec('250'), rec('5', desc='nova')]
+    res = reconcile(iter(left), iter(right))
+    assert res.matched == 1
+    assert [(k[2], lv, rv) for k, lv, rv in res.value_mismatches] == [('aluguel semanal', 20000, 25000)]
+    assert [(k[2], v) for k, v in res.only_left] == [('outra', 30000)]
+    assert [(k[2], v) for k, v in res.only_right] == [('nova', 500)]
+    assert res.deltas() == [('2025-07', '1.1.1 locacao de veiculos', 60000, 35500, -24500)]
+
+
+def test_abs_ignores_sign():
+    assert reconcile(iter([rec('10,00')]), iter([rec('-10,00')])).value_mismatches
+    res = reconcile(iter([rec('10,00')]), iter([rec('-10,00')]), use_abs=True)
+    assert res.matched == 1 and not res.value_mismatches
+
+
+def test_invalid_rows_stay_out_of_join_and_totals():
+    res = reconcile(iter([rec('10'), rec('abc')]), iter([rec('10'), rec('10', data='2025-13-45')]))
+    assert res.matched == 1
+    assert [(side, reason) for side, reason, _ in res.invalid] == [
+        ('esquerda', 'valor inválido'), ('direita', 'data inválida')]
+    assert not res.deltas()
+    assert list(res.totals) == [('2025-07', '1.1.1 locacao de veiculos')]
+
+
+def test_large_same_key_bucket():
+    # todas as linhas sob a mesma (data, categoria, descrição): o join precisa ser O(n)
+    n = 100_000
+    left = [rec(f'{i}.00', desc='') for i in range(n)]
+    res = reconcile(iter(left), reversed(left))
+    assert res.matched == n
+    assert not (res.only_left or res.only_right or res.value_mismatches)
+
+
+def test_csv_semicolon_delimiter_and_filters(tmp_path):
+    path = tmp_path / 'dashboard.csv'
+    path.write_text(
+        'Tipo;Status;Data efetiva;Valor efetivo;Descrição;Categoria\n'
+        'Receita;Conciliado;01/07/2025;1.234,56;Aluguel;1.1.1\n'
+        'Receita;Pendente;02/07/2025;10,00;Aluguel;1.1.1\n'
+        'Receita;Conciliado;03/07/2025;0,00;Aluguel;1.1.1\n'
+        'Outro;Conciliado;04/07/2025;5,00;Aluguel;1.1.1\n'
+        '\n',
+        encoding='utf-8',
+    )
+    # padrão do dashboard: todos os Status e valores zerados; só Tipo inválido sai
+    skipped = {}
+    assert [r[2] for r in iter_ledger(path, skipped=skipped)] == ['1.234,56', '10,00', '0,00']
+    assert skipped == {'tipo inválido': 1}
+
+    skipped = {}
+    assert list(iter_ledger(path, only_reconciled=True, skipped=skipped)) == [
+        ('01/07/2025', '1.1.1', '1.234,56', 'Aluguel')]
+    assert skipped == {'status diferente de Conciliado': 1, 'valor zero': 1, 'tipo inválido': 1}
+
+
+def test_pago_pendente_csv_is_kept():
+    path = Path(__file__).resolve().parent.parent / 'dashboard-financeiro' / 'sample-data.csv'
+    recs = list(iter_ledger(path))
+    assert len(recs) == 15
+    assert not list(iter_ledger(path, only_reconciled=True))
+
+
+def test_month_and_prefix_scope(tmp_path):
+    path = tmp_path / 'ledger.csv'
+    path.write_text(
+        'dataEfetiva,categoria,valorEfetivo,descricao\n'
+        '2025-07-01,1.1.1 Locação,10,a\n'
+        '2025-08-01,1.1.1 Locação,10,b\n'
+        '2025-07-02,2.1.1 Custo,10,c\n'
+        'xx,1.1.1 Locação,10,d\n',
+        encoding='utf-8',
+    )
+    skipped = {}
+    recs = list(iter_ledger(path, months=['2025-07'], prefixes=['1.'], skipped=skipped))
+    # data ilegível passa adiante para ser reportada como inválida
+    assert [r[3] for r in recs] == ['a', 'd']
+    assert skipped == {'fora do período': 1, 'fora das categorias': 1}
+
+
+def _write_xlsx(path: Path, rows):
+    ns = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+    shared = []
+
+    def cell(ref, v):
+        if isinstance(v, str):
+            shared.append(v)
+            return f'<c r="{ref}" t="s"><v>{len(shared) - 1}</v></c>'
+        return f'<c r="{ref}"><v>{v}</v></c>'
+
+    xml_rows = ''.join(
+        f'<row r="{n}">' + ''.join(cell(f'{chr(65 + i)}{n}', v) for i, v in enumerate(row)) + '</row>'
+        for n, row in enumerate(rows, 1)
+    )
+    with zipfile.ZipFile(path, 'w') as z:
+        z.writestr('xl/workbook.xml', (
+            f'<workbook xmlns="{ns}" xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+            '<sheets><sheet name="Plan1" sheetId="1" r:id="rId1"/></sheets></workbook>'))
+        z.writestr('xl/_rels/workbook.xml.rels', (
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" Target="worksheets/sheet1.xml"/></Relationships>'))
+        z.writestr('xl/sharedStrings.xml', f'<sst xmlns="{ns}">' + ''.join(f'<si><t>{s}</t></si>' for s in shared) + '</sst>')
+        z.writestr('xl/worksheets/sheet1.xml', f'<worksheet xmlns="{ns}"><sheetData>{xml_rows}</sheetData></worksheet>')
+
+
+def test_xlsx_vs_csv_exit_codes(tmp_path, capsys):
+    xlsx = tmp_path / 'ledger.xlsx'
+    _write_xlsx(xlsx, [
+        ['Tipo', 'Status', 'Data efetiva', 'Valor efetivo', 'Descrição', 'Categoria'],
+        ['Receita', 'Conciliado', 45839, 701.4, 'ALUGUEL SEMANAL ', CAT],
+        ['Receita', 'Pendente', 45839, 50, 'ALUGUEL SEMANAL', CAT],
+    ])
+    export = tmp_path / 'out.csv'
+    export.write_text(
+        'dataEfetiva,categoria,valorEfetivo,descricao\n'
+        f'2025-07-01T00:00:00,{CAT},701.4,ALUGUEL SEMANAL\n',
+        encoding='utf-8',
+    )
+    assert main([str(xlsx), str(export), '--so-conciliado']) == 0
+    out = capsys.readouterr().out
+    assert 'Linhas esquerda: 1 | direita: 1 | conciliadas: 1' in out
+    assert "Descartadas na esquerda (filtros): {'status diferente de Conciliado': 1}" in out
+    assert '(sem diferenças)' in out
+
+    # sem --so-conciliado a linha Pendente entra e fica faltando à direita
+    assert main([str(xlsx), str(export)]) == 1
+    assert 'Faltando à direita: 1 | faltando à esquerda: 0' in capsys.readouterr().out
+
+    with export.open('a', encoding='utf-8') as f:
+        f.write(f'2025-07-02T00:00:00,{CAT},10,extra\n')
+    diff = tmp_path / 'diff.csv'
+    assert main([str(xlsx), str(export), '--so-conciliado', '--saida', str(diff)]) == 1
+    assert 'faltando_esquerda,2025-07-02' in diff.read_text(encoding='utf-8')
+    out = capsys.readouterr().out
+    assert 'Faltando à direita: 0 | faltando à esquerda: 1' in out
+    assert '2025-07; 1.1.1 locacao de veiculos; R$ 701,40; R$ 711,40; R$ 10,00' in out
+
+
+def test_differences_csv_has_fixed_width(tmp_path):
+    res = reconcile(iter([rec('10'), rec('20', desc='x'), rec('abc')]), iter([rec('11'), rec('5', desc='y')]))
+    out = tmp_path / 'diff.csv'
+    write_differences(res, out)
+    with out.open(newline='', encoding='utf-8') as f:
+        rows = list(csv.reader(f))
+    assert {r[0] for r in rows[1:]} == {
+        'faltando_direita', 'faltando_esquerda', 'valor_divergente', 'invalida_esquerda'}
+    assert {len(r) for r in rows} == {7}
+
+
+def test_bad_inputs_fail_early_with_exit_code_2(tmp_path, capsys):
+    no_value = tmp_path / 'sem_valor.csv'
+    no_value.write_text('data,categoria\n2025-07-01,1.1.1\n', encoding='utf-8')
+    with pytest.raises(ValueError, match='data/valor'):
+        iter_ledger(no_value)  # na chamada, não ao consumir o gerador
+
+    good = tmp_path / 'ok.csv'
+    good.write_text('data,valor\n2025-07-01,10\n', encoding='utf-8')
+    bank = tmp_path / 'banco.csv'
+    bank.write_bytes('Data;Valor;Descrição\n01/07/2025;10,00;Tarifa\n'.encode('cp1252'))
+
+    assert main([str(good), str(no_value)]) == 2
+    assert main([str(good), str(tmp_path / 'nao_existe.csv')]) == 2
+    assert main([str(good), str(bank)]) == 2
+    assert '--encoding cp1252' in capsys.readouterr().err
+    assert main([str(good), str(bank), '--encoding', 'cp1252']) == 1